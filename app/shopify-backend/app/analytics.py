@@ -0,0 +1,168 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+import copy
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+
+def grow(array: np.ndarray, min_size: int, fill=0):
+    capacity = len(array)
+    if capacity >= min_size:
+        return array
+    while capacity < min_size:
+        capacity *= 2
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+# Append-only columnar store of order lines. Each line is one row across
+# parallel NumPy arrays. Order status lives in a separate array indexed by
+# order id, so status changes never rewrite line rows. Rows are appended in
+# time order, which lets reports find a time range with a binary search.
+class OrderLineStore:
+    def __init__(self, categories: Sequence, statuses: Sequence):
+        self.categories = list(categories)
+        self.statuses = list(statuses)
+        self.category_codes = {category: code for code, category in enumerate(self.categories)}
+        self.status_codes = {status: code for code, status in enumerate(self.statuses)}
+
+        self.size = 0
+        self.timestamps = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.order_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.product_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.category_ids = np.zeros(INITIAL_CAPACITY, dtype=np.int8)
+        self.quantities = np.zeros(INITIAL_CAPACITY, dtype=np.int32)
+        self.cents = np.zeros(INITIAL_CAPACITY, dtype=np.int64)
+        self.order_status = np.full(INITIAL_CAPACITY, -1, dtype=np.int8)
+
+    def append_order(
+        self,
+        order_id: int,
+        timestamp: int,
+        status,
+        lines: Iterable[Tuple[int, object, int, int]],
+    ):
+        # lines holds (product_id, category, quantity, cents) tuples.
+        lines = list(lines)
+        start = self.size
+        end = start + len(lines)
+
+        # Clamp to the newest timestamp so the column stays sorted even if
+        # the wall clock steps backwards.
+        if start:
+            timestamp = max(timestamp, int(self.timestamps[start - 1]))
+
+        self.timestamps = grow(self.timestamps, end)
+        self.order_ids = grow(self.order_ids, end)
+        self.product_ids = grow(self.product_ids, end)
+        self.category_ids = grow(self.category_ids, end)
+        self.quantities = grow(self.quantities, end)
+        self.cents = grow(self.cents, end)
+
+        self.timestamps[start:end] = timestamp
+        self.order_ids[start:end] = order_id
+        for row, (product_id, category, quantity, cents) in enumerate(lines, start):
+            self.product_ids[row] = product_id
+            self.category_ids[row] = self.category_codes[category]
+            self.quantities[row] = quantity
+            self.cents[row] = cents
+        self.size = end
+
+        self.set_order_status(order_id, status)
+
+    def append_columns(
+        self,
+        timestamps: np.ndarray,
+        order_ids: np.ndarray,
+        product_ids: np.ndarray,
+        category_ids: np.ndarray,
+        quantities: np.ndarray,
+        cents: np.ndarray,
+    ):
+        # Bulk append of already encoded, time-sorted rows, e.g. for backfills.
+        # Their orders have no status until set_order_status is called.
+        start = self.size
+        end = start + len(timestamps)
+        for name, values in (
+            ("timestamps", timestamps),
+            ("order_ids", order_ids),
+            ("product_ids", product_ids),
+            ("category_ids", category_ids),
+            ("quantities", quantities),
+            ("cents", cents),
+        ):
+            column = grow(getattr(self, name), end)
+            column[start:end] = values
+            setattr(self, name, column)
+        self.size = end
+
+    def set_order_status(self, order_id: int, status):
+        self.order_status = grow(self.order_status, order_id + 1, fill=-1)
+        self.order_status[order_id] = self.status_codes[status]
+
+    def snapshot(self):
+        # A shallow copy pins the current size and column arrays. Appends
+        # only write past that size or swap in grown arrays, so the copy can
+        # be read from another thread while the original keeps changing.
+        return copy.copy(self)
+
+    def report(
+        self,
+        start: int,
+        end: int,
+        bucket_seconds: int,
+        by_category: bool = False,
+        by_status: bool = False,
+        statuses: Optional[Iterable] = None,
+        bucket_offset: int = 0,
+    ) -> List[dict]:
+        # Buckets start at multiples of bucket_seconds since the epoch, moved
+        # forward by bucket_offset. With no offset daily buckets start at
+        # midnight UTC; weekly ones would start on a Thursday, as
+        # 1970-01-01 was one.
+        timestamps = self.timestamps[:self.size]
+        lo = np.searchsorted(timestamps, start, side="left")
+        hi = np.searchsorted(timestamps, end, side="left")
+
+        order_status = self.order_status[self.order_ids[lo:hi]]
+        mask = None
+        if statuses is not None:
+            codes = [self.status_codes[status] for status in statuses]
+            mask = np.isin(order_status, codes)
+        elif by_status:
+            # Lines of orders without a recorded status cannot be grouped
+            # by status.
+            mask = order_status >= 0
+
+        def column(values):
+            values = values[lo:hi]
+            return values if mask is None else values[mask]
+
+        first_bucket = (start - bucket_offset) // bucket_seconds
+        bucket_count = (end - 1 - bucket_offset) // bucket_seconds - first_bucket + 1
+        category_count = len(self.categories) if by_category else 1
+        status_count = len(self.statuses) if by_status else 1
+
+        keys = (column(timestamps) - bucket_offset) // bucket_seconds - first_bucket
+        if by_category:
+            keys = keys * category_count + column(self.category_ids)
+        if by_status:
+            keys = keys * status_count + (order_status if mask is None else order_status[mask])
+
+        group_count = bucket_count * category_count * status_count
+        line_counts = np.bincount(keys, minlength=group_count)
+        quantities = np.bincount(keys, weights=column(self.quantities), minlength=group_count)
+        cents = np.bincount(keys, weights=column(self.cents), minlength=group_count)
+
+        rows = []
+        for key in np.flatnonzero(line_counts):
+            group, status_code = divmod(int(key), status_count)
+            bucket, category_code = divmod(group, category_count)
+            rows.append({
+                "bucket_start": (first_bucket + bucket) * bucket_seconds + bucket_offset,
+                "category": self.categories[category_code] if by_category else None,
+                "status": self.statuses[status_code] if by_status else None,
+                "quantity": int(quantities[key]),
+                "revenue": round(float(cents[key]) / 100, 2),
+                "order_lines": int(line_counts[key]),
+            })
+        return rows
@@ -0,0 +1,104 @@
+from fastapi import HTTPException, status
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import os
+import time
+
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", str(24 * 60 * 60)))
+IDEMPOTENCY_CACHE_MAX_ENTRIES = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "10000"))
+
+# Entries are kept in insertion order. Every entry gets the same TTL, so the
+# oldest entry is always the first to expire and the first to be dropped when
+# the cache is full.
+idempotency_cache = OrderedDict()
+
+def evict_expired_entries(now: float):
+    while idempotency_cache:
+        cache_key, entry = next(iter(idempotency_cache.items()))
+        if entry["expires_at"] > now:
+            break
+        del idempotency_cache[cache_key]
+
+def evict_overflow_entries():
+    overflow = len(idempotency_cache) - IDEMPOTENCY_CACHE_MAX_ENTRIES
+    if overflow <= 0:
+        return
+
+    # Requests still in flight are never evicted, otherwise a concurrent
+    # duplicate would miss the cache and run the handler a second time. The
+    # cache may therefore exceed its limit while many requests are running.
+    evictable = []
+    for cache_key, entry in idempotency_cache.items():
+        if len(evictable) == overflow:
+            break
+        if entry["done"].is_set():
+            evictable.append(cache_key)
+
+    for cache_key in evictable:
+        del idempotency_cache[cache_key]
+
+async def run_idempotent(
+    scope: str,
+    user_id: int,
+    idempotency_key: Optional[str],
+    fingerprint: str,
+    handler: Callable[[], Awaitable[Any]],
+):
+    if not idempotency_key:
+        return await handler()
+
+    cache_key = (scope, user_id, idempotency_key)
+
+    while True:
+        now = time.monotonic()
+        evict_expired_entries(now)
+
+        entry = idempotency_cache.get(cache_key)
+        if entry is None:
+            break
+
+        if entry["fingerprint"] != fingerprint:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Idempotency-Key was already used with a different request body",
+            )
+
+        # A duplicate that arrives while the first request is still running
+        # waits for its outcome instead of executing the handler again.
+        await entry["done"].wait()
+        if entry["error"] is not None:
+            raise entry["error"]
+        if entry["completed"]:
+            return entry["response"]
+        # The first request was cancelled before it finished, so there is no
+        # outcome to share; look the key up again and run it if needed.
+
+    entry = {
+        "fingerprint": fingerprint,
+        "expires_at": now + IDEMPOTENCY_KEY_TTL_SECONDS,
+        "done": asyncio.Event(),
+        "completed": False,
+        "response": None,
+        "error": None,
+    }
+    idempotency_cache[cache_key] = entry
+
+    evict_overflow_entries()
+
+    try:
+        entry["response"] = await handler()
+        entry["completed"] = True
+    except Exception as e:
+        # Failures are handed to requests already waiting on this key but are
+        # not cached, so a later retry gets to run the handler again.
+        entry["error"] = e
+        raise
+    finally:
+        # Only successful responses stay cached. This also covers
+        # cancellation, which is not an Exception and leaves no outcome.
+        if not entry["completed"] and idempotency_cache.get(cache_key) is entry:
+            del idempotency_cache[cache_key]
+        entry["done"].set()
+
+    return entry["response"]
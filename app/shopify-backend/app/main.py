@@ -1,10 +1,19 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 import psycopg
 
-from app.routers import users, products, cart, orders
+from app.routers import users, products, cart, orders, admin
+from app import tasks
 
-app = FastAPI(title="Shopify Clone API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await tasks.start_workers()
+    yield
+    await tasks.stop_workers()
+    products.shutdown_image_executor()
+
+app = FastAPI(title="Shopify Clone API", lifespan=lifespan)
 
 # Disable CORS. Do not remove this for full-stack development.
 app.add_middleware(
@@ -19,6 +28,7 @@ app.include_router(users.router)
 app.include_router(products.router)
 app.include_router(cart.router)
 app.include_router(orders.router)
+app.include_router(admin.router)
 
 @app.get("/healthz")
 async def healthz():
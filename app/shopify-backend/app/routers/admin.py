@@ -0,0 +1,123 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime, timezone
+from enum import Enum
+import asyncio
+from .users import get_current_active_user, UserRole
+from .products import ProductCategory
+from .cart import get_cart_metrics
+from .orders import OrderStatus, order_lines_store
+from ..tasks import get_task_metrics
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+)
+
+REPORT_MAX_BUCKETS = 10000
+
+class ReportBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
+    WEEK = "week"
+
+class ReportGroupBy(str, Enum):
+    CATEGORY = "category"
+    STATUS = "status"
+
+BUCKET_SECONDS = {
+    ReportBucket.HOUR: 60 * 60,
+    ReportBucket.DAY: 24 * 60 * 60,
+    ReportBucket.WEEK: 7 * 24 * 60 * 60,
+}
+
+# The epoch was a Thursday, so weekly buckets are moved forward four days
+# to start on Monday 00:00 UTC.
+BUCKET_OFFSET_SECONDS = {
+    ReportBucket.HOUR: 0,
+    ReportBucket.DAY: 0,
+    ReportBucket.WEEK: 4 * 24 * 60 * 60,
+}
+
+class ReportRow(BaseModel):
+    bucket_start: datetime
+    category: Optional[ProductCategory] = None
+    status: Optional[OrderStatus] = None
+    quantity: int
+    revenue: float
+    order_lines: int
+
+def to_timestamp(value: datetime):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+@router.get("/reports", response_model=List[ReportRow])
+async def get_report(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    bucket: ReportBucket = ReportBucket.DAY,
+    group_by: List[ReportGroupBy] = Query([]),
+    statuses: Optional[List[OrderStatus]] = Query(None),
+    current_user: dict = Depends(get_current_active_user)
+):
+    if current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view reports",
+        )
+    
+    end_ts = to_timestamp(end) if end else to_timestamp(datetime.utcnow()) + 1
+    start_ts = to_timestamp(start) if start else end_ts - 90 * 24 * 60 * 60
+    bucket_seconds = BUCKET_SECONDS[bucket]
+    
+    if start_ts >= end_ts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be before end",
+        )
+    
+    if (end_ts - start_ts) // bucket_seconds > REPORT_MAX_BUCKETS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Too many buckets, use a larger bucket or a shorter range",
+        )
+    
+    # The aggregation can take hundreds of milliseconds on large stores, so
+    # it runs in a thread on a snapshot instead of blocking the event loop.
+    rows = await asyncio.to_thread(
+        order_lines_store.snapshot().report,
+        start_ts,
+        end_ts,
+        bucket_seconds,
+        by_category=ReportGroupBy.CATEGORY in group_by,
+        by_status=ReportGroupBy.STATUS in group_by,
+        statuses=statuses,
+        bucket_offset=BUCKET_OFFSET_SECONDS[bucket],
+    )
+    
+    for row in rows:
+        row["bucket_start"] = datetime.fromtimestamp(row["bucket_start"], tz=timezone.utc)
+    
+    return rows
+
+@router.get("/metrics/tasks")
+async def task_metrics(current_user: dict = Depends(get_current_active_user)):
+    if current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view metrics",
+        )
+    
+    return get_task_metrics()
+
+@router.get("/metrics/carts")
+async def cart_metrics(current_user: dict = Depends(get_current_active_user)):
+    if current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view metrics",
+        )
+    
+    return get_cart_metrics()
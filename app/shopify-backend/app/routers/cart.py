@@ -2,6 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime
+from collections import OrderedDict
+import os
+import time
 from .users import get_current_active_user
 from .products import products_db, Product
 
@@ -13,6 +16,23 @@ router = APIRouter(
 cart_items_db = {}
 cart_item_id_counter = 1
 
+CART_TTL_SECONDS = int(os.getenv("CART_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+# Hard cap on the total number of cart items across all users, 0 disables it.
+CART_MAX_ITEMS = int(os.getenv("CART_MAX_ITEMS", "0"))
+
+# user_id -> ids of that user's cart items
+user_cart_item_ids = {}
+# user_id -> last time the cart was touched, least recently touched first.
+# Only users who currently hold cart items are tracked.
+# Expired carts therefore sit at the front and are swept lazily on each
+# cart access, and the same order drives LRU eviction under the hard cap.
+cart_last_touched = OrderedDict()
+
+cart_metrics = {
+    "expired_carts": 0,
+    "evicted_carts": 0,
+}
+
 class CartItemBase(BaseModel):
     product_id: int
     quantity: int
@@ -28,20 +48,75 @@ class CartItem(CartItemBase):
     class Config:
         orm_mode = True
 
+def clear_user_cart(user_id: int):
+    item_ids = user_cart_item_ids.pop(user_id, [])
+    for item_id in item_ids:
+        del cart_items_db[item_id]
+    cart_last_touched.pop(user_id, None)
+    return len(item_ids)
+
+def delete_cart_item(item_id: int):
+    user_id = cart_items_db.pop(item_id)["user_id"]
+    user_cart_item_ids[user_id].remove(item_id)
+    if not user_cart_item_ids[user_id]:
+        del user_cart_item_ids[user_id]
+        cart_last_touched.pop(user_id, None)
+
+def get_user_cart_item_ids(user_id: int):
+    return list(user_cart_item_ids.get(user_id, []))
+
+def remove_cart_items(item_ids: List[int]):
+    # Items that were already removed, e.g. by the user or by cart expiry,
+    # are skipped.
+    for item_id in item_ids:
+        if item_id in cart_items_db:
+            delete_cart_item(item_id)
+
+def touch_cart(user_id: int):
+    now = time.monotonic()
+    cutoff = now - CART_TTL_SECONDS
+    
+    while cart_last_touched:
+        oldest_user_id, touched_at = next(iter(cart_last_touched.items()))
+        if touched_at > cutoff:
+            break
+        if clear_user_cart(oldest_user_id):
+            cart_metrics["expired_carts"] += 1
+    
+    if user_id in user_cart_item_ids:
+        cart_last_touched[user_id] = now
+        cart_last_touched.move_to_end(user_id)
+
+def enforce_cart_limit():
+    # The most recently touched cart is never evicted, even if it alone is
+    # over the cap.
+    while CART_MAX_ITEMS and len(cart_items_db) > CART_MAX_ITEMS and len(cart_last_touched) > 1:
+        oldest_user_id = next(iter(cart_last_touched))
+        if clear_user_cart(oldest_user_id):
+            cart_metrics["evicted_carts"] += 1
+
+def get_cart_metrics():
+    return {
+        **cart_metrics,
+        "live_carts": len(user_cart_item_ids),
+        "cart_items": len(cart_items_db),
+    }
+
 @router.get("", response_model=List[CartItem])
 async def get_cart_items(current_user: dict = Depends(get_current_active_user)):
     user_id = current_user["id"]
+    touch_cart(user_id)
     user_cart_items = []
     
-    for item_id, item in cart_items_db.items():
-        if item["user_id"] == user_id:
-            product = products_db.get(item["product_id"])
-            if product:
-                cart_item = {
-                    **item,
-                    "product": product
-                }
-                user_cart_items.append(cart_item)
+    for item_id in user_cart_item_ids.get(user_id, []):
+        item = cart_items_db[item_id]
+        product = products_db.get(item["product_id"])
+        if product:
+            cart_item = {
+                **item,
+                "product": product
+            }
+            user_cart_items.append(cart_item)
     
     return user_cart_items
 
@@ -52,6 +127,7 @@ async def add_to_cart(
 ):
     global cart_item_id_counter
     user_id = current_user["id"]
+    touch_cart(user_id)
     
     if cart_item.product_id not in products_db:
         raise HTTPException(
@@ -66,8 +142,9 @@ async def add_to_cart(
             detail="Not enough inventory available",
         )
     
-    for item_id, item in cart_items_db.items():
-        if item["user_id"] == user_id and item["product_id"] == cart_item.product_id:
+    for item_id in user_cart_item_ids.get(user_id, []):
+        item = cart_items_db[item_id]
+        if item["product_id"] == cart_item.product_id:
             new_quantity = item["quantity"] + cart_item.quantity
             
             if product["inventory_count"] < new_quantity:
@@ -90,8 +167,12 @@ async def add_to_cart(
     }
     
     cart_items_db[cart_item_id_counter] = new_cart_item
+    user_cart_item_ids.setdefault(user_id, []).append(cart_item_id_counter)
     cart_item_id_counter += 1
     
+    touch_cart(user_id)
+    enforce_cart_limit()
+    
     return {
         **new_cart_item,
         "product": product
@@ -104,6 +185,7 @@ async def update_cart_item(
     current_user: dict = Depends(get_current_active_user)
 ):
     user_id = current_user["id"]
+    touch_cart(user_id)
     
     if item_id not in cart_items_db:
         raise HTTPException(
@@ -145,6 +227,7 @@ async def remove_from_cart(
     current_user: dict = Depends(get_current_active_user)
 ):
     user_id = current_user["id"]
+    touch_cart(user_id)
     
     if item_id not in cart_items_db:
         raise HTTPException(
@@ -159,20 +242,12 @@ async def remove_from_cart(
             detail="Not authorized to remove this cart item",
         )
     
-    del cart_items_db[item_id]
+    delete_cart_item(item_id)
     
     return {"message": "Cart item removed successfully"}
 
 @router.delete("")
 async def clear_cart(current_user: dict = Depends(get_current_active_user)):
-    user_id = current_user["id"]
-    
-    items_to_remove = []
-    for item_id, item in cart_items_db.items():
-        if item["user_id"] == user_id:
-            items_to_remove.append(item_id)
-    
-    for item_id in items_to_remove:
-        del cart_items_db[item_id]
+    clear_user_cart(current_user["id"])
     
     return {"message": "Cart cleared successfully"}
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
+import asyncio
 import os
 import stripe
 from .users import get_current_active_user, UserRole
-from .products import products_db
-from .cart import cart_items_db
+from .products import products_db, ProductCategory
+from .cart import get_user_cart_item_ids, remove_cart_items
+from ..idempotency import run_idempotent
+from ..tasks import enqueue_task
+from ..analytics import OrderLineStore
 
 stripe.api_key = os.getenv("STRIPE_API_KEY", "your_stripe_api_key")
 
@@ -27,6 +31,8 @@ class OrderStatus(str, Enum):
     DELIVERED = "delivered"
     CANCELLED = "cancelled"
 
+order_lines_store = OrderLineStore(categories=list(ProductCategory), statuses=list(OrderStatus))
+
 class OrderItemBase(BaseModel):
     product_id: int
     quantity: int
@@ -95,13 +101,8 @@ async def get_order(
     
     return order
 
-@router.post("", response_model=Order)
-async def create_order(
-    order_data: OrderBase,
-    current_user: dict = Depends(get_current_active_user)
-):
+def place_order(order_data: OrderBase, user_id: int):
     global order_id_counter, order_item_id_counter
-    user_id = current_user["id"]
     
     new_order = {
         "id": order_id_counter,
@@ -145,16 +146,47 @@ async def create_order(
     orders_db[order_id_counter] = new_order
     order_id_counter += 1
     
-    items_to_remove = []
-    for item_id, item in cart_items_db.items():
-        if item["user_id"] == user_id:
-            items_to_remove.append(item_id)
-    
-    for item_id in items_to_remove:
-        del cart_items_db[item_id]
+    order_lines_store.append_order(
+        new_order["id"],
+        int(new_order["created_at"].replace(tzinfo=timezone.utc).timestamp()),
+        new_order["status"],
+        [
+            (
+                item["product_id"],
+                item["product"]["category"],
+                item["quantity"],
+                round(item["price_at_purchase"] * 100) * item["quantity"],
+            )
+            for item in new_order["items"]
+        ],
+    )
     
     return new_order
 
+@router.post("", response_model=Order)
+async def create_order(
+    order_data: OrderBase,
+    current_user: dict = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None),
+):
+    user_id = current_user["id"]
+    
+    async def handler():
+        new_order = place_order(order_data, user_id)
+        # Post-checkout side effects run on the background workers so the
+        # order is returned as soon as it has been recorded. Only the items
+        # in the cart at checkout are removed, so anything added after it
+        # survives the deferred cleanup. enqueue_task never raises for job
+        # failures, so once the order is saved the request cannot fail and
+        # the idempotency key always ends up pointing at this order.
+        cart_item_ids = get_user_cart_item_ids(user_id)
+        await enqueue_task(remove_cart_items, cart_item_ids)
+        return new_order
+    
+    return await run_idempotent(
+        "orders.create", user_id, idempotency_key, order_data.json(), handler
+    )
+
 @router.put("/{order_id}/status", response_model=Order)
 async def update_order_status(
     order_id: int,
@@ -174,13 +206,15 @@ async def update_order_status(
         )
     
     orders_db[order_id]["status"] = status
+    order_lines_store.set_order_status(order_id, status)
     
     return orders_db[order_id]
 
 @router.post("/payment", response_model=PaymentIntentResponse)
 async def create_payment_intent(
     payment_data: PaymentIntent,
-    current_user: dict = Depends(get_current_active_user)
+    current_user: dict = Depends(get_current_active_user),
+    idempotency_key: Optional[str] = Header(None),
 ):
     if payment_data.order_id not in orders_db:
         raise HTTPException(
@@ -202,17 +236,25 @@ async def create_payment_intent(
             detail="Order is not in pending status",
         )
     
-    try:
-        amount = int(order["total_amount"] * 100)  # Convert to cents
-        intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency="usd",
-            metadata={"order_id": order["id"]},
-        )
-        
-        return {"client_secret": intent.client_secret}
-    except Exception as e:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e),
-        )
+    async def handler():
+        try:
+            amount = int(order["total_amount"] * 100)  # Convert to cents
+            # The client secret is part of the response, so the Stripe call
+            # stays on the request path but no longer blocks the event loop.
+            intent = await asyncio.to_thread(
+                stripe.PaymentIntent.create,
+                amount=amount,
+                currency="usd",
+                metadata={"order_id": order["id"]},
+            )
+            
+            return {"client_secret": intent.client_secret}
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=str(e),
+            )
+    
+    return await run_idempotent(
+        "orders.payment", current_user["id"], idempotency_key, payment_data.json(), handler
+    )
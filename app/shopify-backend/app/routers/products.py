@@ -1,8 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.responses import FileResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from PIL import Image, ImageOps, UnidentifiedImageError
+import asyncio
+import hashlib
+import os
+import tempfile
+import warnings
 from .users import get_current_active_user, UserRole
 
 router = APIRouter(
@@ -13,6 +22,24 @@ router = APIRouter(
 products_db = {}
 product_id_counter = 1
 
+PRODUCT_IMAGE_DIR = os.getenv("PRODUCT_IMAGE_DIR", "media/products")
+# Public URL prefix for image variants. It must be reachable from the
+# browser, which uses image URLs as-is; the default matches the frontend's
+# local API_URL.
+PRODUCT_IMAGE_BASE_URL = os.getenv("PRODUCT_IMAGE_BASE_URL", "http://localhost:8000/products/images")
+PRODUCT_IMAGE_MAX_BYTES = int(os.getenv("PRODUCT_IMAGE_MAX_BYTES", str(10 * 1024 * 1024)))
+PRODUCT_IMAGE_WORKERS = int(os.getenv("PRODUCT_IMAGE_WORKERS", "2"))
+PRODUCT_IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Maximum width in pixels of each generated variant.
+IMAGE_VARIANT_WIDTHS = {
+    "thumbnail": 200,
+    "card": 400,
+    "detail": 800,
+}
+
+image_executor: Optional[ProcessPoolExecutor] = None
+
 class ProductCategory(str, Enum):
     ELECTRONICS = "electronics"
     CLOTHING = "clothing"
@@ -35,6 +62,7 @@ class ProductCreate(ProductBase):
 class Product(ProductBase):
     id: int
     created_at: datetime
+    image_variants: Optional[Dict[str, str]] = None
 
     class Config:
         orm_mode = True
@@ -104,10 +132,95 @@ def init_sample_products():
 
 init_sample_products()
 
+def write_file_atomic(path: str, data: bytes):
+    # Files are named after their content, so an existing file already holds
+    # these bytes. Each writer gets its own temp file, so concurrent uploads
+    # of the same image cannot clobber each other's partial writes.
+    if os.path.exists(path):
+        return
+    with tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(path), prefix=".upload-", suffix=".tmp", delete=False
+    ) as f:
+        f.write(data)
+    try:
+        os.replace(f.name, path)
+    except OSError:
+        os.unlink(f.name)
+        raise
+
+class InvalidImageError(Exception):
+    pass
+
+def generate_image_variants(data: bytes, variants_dir: str):
+    # Runs in a worker process, so it only takes and returns plain values.
+    # Decoding happens entirely in memory, so any error raised while doing it
+    # means the upload is not a usable image, while errors writing the
+    # variants to disk propagate unchanged.
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", Image.DecompressionBombWarning)
+            with Image.open(BytesIO(data)) as original:
+                original.load()
+                image = ImageOps.exif_transpose(original)
+    except Image.DecompressionBombWarning as e:
+        raise Image.DecompressionBombError(str(e))
+    except (UnidentifiedImageError, SyntaxError, ValueError, OSError) as e:
+        raise InvalidImageError(str(e))
+    
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+    
+    variants = {}
+    for name, width in IMAGE_VARIANT_WIDTHS.items():
+        variant = image.copy()
+        if variant.width > width:
+            height = max(1, round(variant.height * width / variant.width))
+            variant = variant.resize((width, height), Image.LANCZOS)
+        
+        buffer = BytesIO()
+        variant.save(buffer, format="WEBP", quality=80, method=4)
+        variant_data = buffer.getvalue()
+        
+        filename = f"{name}-{hashlib.sha256(variant_data).hexdigest()[:20]}.webp"
+        write_file_atomic(os.path.join(variants_dir, filename), variant_data)
+        variants[name] = filename
+    
+    return variants
+
+def get_image_executor():
+    global image_executor
+    if image_executor is None:
+        image_executor = ProcessPoolExecutor(max_workers=PRODUCT_IMAGE_WORKERS)
+    return image_executor
+
+def shutdown_image_executor():
+    global image_executor
+    if image_executor is not None:
+        image_executor.shutdown(wait=True, cancel_futures=True)
+        image_executor = None
+
 @router.get("", response_model=List[Product])
 async def get_products():
     return list(products_db.values())
 
+@router.get("/images/{filename}")
+async def get_product_image(filename: str):
+    path = os.path.join(PRODUCT_IMAGE_DIR, "variants", filename)
+    if os.path.basename(filename) != filename or not os.path.isfile(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Image not found",
+        )
+    
+    # Filenames are content hashes, so a URL always refers to the same bytes
+    # and clients may cache it indefinitely. FileResponse handles Range
+    # requests and streams from disk (zero-copy where the server supports it).
+    return FileResponse(
+        path,
+        media_type="image/webp",
+        headers={"Cache-Control": PRODUCT_IMAGE_CACHE_CONTROL},
+    )
+
 @router.get("/{product_id}", response_model=Product)
 async def get_product(product_id: int):
     if product_id not in products_db:
@@ -165,10 +278,82 @@ async def update_product(
         **product.dict()
     }
     
+    existing_product = products_db[product_id]
+    if existing_product.get("image_variants") and existing_product["image_url"] == product.image_url:
+        updated_product["image_variants"] = existing_product["image_variants"]
+    
     products_db[product_id] = updated_product
     
     return updated_product
 
+@router.post("/{product_id}/image", response_model=Product)
+async def upload_product_image(
+    product_id: int,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_active_user)
+):
+    if current_user["role"] != UserRole.ADMIN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to upload product images",
+        )
+    
+    if product_id not in products_db:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found",
+        )
+    
+    if not (file.content_type or "").startswith("image/"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is not an image",
+        )
+    
+    data = await file.read(PRODUCT_IMAGE_MAX_BYTES + 1)
+    if len(data) > PRODUCT_IMAGE_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Image is too large",
+        )
+    
+    originals_dir = os.path.join(PRODUCT_IMAGE_DIR, "originals")
+    variants_dir = os.path.join(PRODUCT_IMAGE_DIR, "variants")
+    os.makedirs(originals_dir, exist_ok=True)
+    os.makedirs(variants_dir, exist_ok=True)
+    
+    loop = asyncio.get_running_loop()
+    try:
+        variants = await loop.run_in_executor(
+            get_image_executor(), generate_image_variants, data, variants_dir
+        )
+    except InvalidImageError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Uploaded file is not a valid image",
+        )
+    except Image.DecompressionBombError:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Image dimensions are too large",
+        )
+    
+    # The original is only stored once it is known to be a valid image, so
+    # rejected uploads leave nothing behind.
+    _, extension = os.path.splitext(file.filename or "")
+    original_path = os.path.join(
+        originals_dir, f"{hashlib.sha256(data).hexdigest()}{extension.lower()}"
+    )
+    await asyncio.to_thread(write_file_atomic, original_path, data)
+    
+    product = products_db[product_id]
+    product["image_variants"] = {
+        name: f"{PRODUCT_IMAGE_BASE_URL}/{filename}" for name, filename in variants.items()
+    }
+    product["image_url"] = product["image_variants"]["detail"]
+    
+    return product
+
 @router.delete("/{product_id}")
 async def delete_product(
     product_id: int,
@@ -5,7 +5,12 @@ from typing import Optional
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from collections import OrderedDict
+import hashlib
+import hmac
 import os
+import secrets
+import time
 from enum import Enum
 
 users_db = {}
@@ -16,6 +21,15 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your_jwt_secret_key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "14"))
+# Absolute lifetime of a session, however often it is refreshed. After that
+# the user has to log in with their password again.
+SESSION_MAX_LIFETIME_DAYS = int(os.getenv("SESSION_MAX_LIFETIME_DAYS", "90"))
+
+# session_id -> {"user_id", "token_digest", "created_at", "expires_at"}. Every refresh
+# pushes a session to the end with a fresh expiry, so expired sessions are
+# always at the front and can be swept without scanning the whole table.
+sessions_db = OrderedDict()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/token")
 
@@ -46,6 +60,10 @@ class User(UserBase):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -80,6 +98,70 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def hash_refresh_secret(secret: str):
+    return hmac.new(SECRET_KEY.encode(), secret.encode(), hashlib.sha256).digest()
+
+def evict_expired_sessions(now: float):
+    while sessions_db:
+        session_id, session = next(iter(sessions_db.items()))
+        if session["expires_at"] > now:
+            break
+        del sessions_db[session_id]
+
+def issue_refresh_token(user_id: int, session_id: Optional[str] = None):
+    now = time.monotonic()
+    evict_expired_sessions(now)
+    
+    if session_id is None:
+        session_id = secrets.token_urlsafe(12)
+        created_at = now
+    else:
+        created_at = sessions_db[session_id]["created_at"]
+    secret = secrets.token_urlsafe(32)
+    
+    sessions_db[session_id] = {
+        "user_id": user_id,
+        "token_digest": hash_refresh_secret(secret),
+        "created_at": created_at,
+        "expires_at": now + REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60,
+    }
+    sessions_db.move_to_end(session_id)
+    
+    return f"{session_id}.{secret}"
+
+def get_session(refresh_token: str):
+    now = time.monotonic()
+    evict_expired_sessions(now)
+    
+    session_id, _, secret = refresh_token.partition(".")
+    session = sessions_db.get(session_id)
+    if session is None:
+        return None, None
+    
+    if now - session["created_at"] > SESSION_MAX_LIFETIME_DAYS * 24 * 60 * 60:
+        del sessions_db[session_id]
+        return None, None
+    
+    if not hmac.compare_digest(session["token_digest"], hash_refresh_secret(secret)):
+        # A rotated-out token being presented again means it may have been
+        # stolen, so the whole session is revoked.
+        del sessions_db[session_id]
+        return None, None
+    
+    return session_id, session
+
+def create_tokens(user: dict, session_id: Optional[str] = None):
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user["email"]}, expires_delta=access_token_expires
+    )
+    refresh_token = issue_refresh_token(user["id"], session_id)
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -162,11 +244,26 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user["email"]}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_tokens(user)
+
+@router.post("/token/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshTokenRequest):
+    session_id, session = get_session(request.refresh_token)
+    user = users_db.get(session["user_id"]) if session else None
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return create_tokens(user, session_id)
+
+@router.post("/token/revoke")
+async def revoke_refresh_token(request: RefreshTokenRequest):
+    session_id, session = get_session(request.refresh_token)
+    if session is not None:
+        del sessions_db[session_id]
+    return {"message": "Refresh token revoked"}
 
 @router.get("/me", response_model=User)
 async def read_users_me(current_user: dict = Depends(get_current_active_user)):
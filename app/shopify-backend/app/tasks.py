@@ -0,0 +1,132 @@
+from typing import Any, Callable, List, Optional
+import asyncio
+import logging
+import os
+
+TASK_WORKER_COUNT = int(os.getenv("TASK_WORKER_COUNT", "4"))
+TASK_QUEUE_MAX_SIZE = int(os.getenv("TASK_QUEUE_MAX_SIZE", "10000"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "5"))
+TASK_RETRY_BASE_DELAY_SECONDS = float(os.getenv("TASK_RETRY_BASE_DELAY_SECONDS", "0.5"))
+TASK_SHUTDOWN_TIMEOUT_SECONDS = float(os.getenv("TASK_SHUTDOWN_TIMEOUT_SECONDS", "10"))
+
+logger = logging.getLogger(__name__)
+
+task_queue: Optional[asyncio.Queue] = None
+workers: List[asyncio.Task] = []
+pending_retries = set()
+
+task_metrics = {
+    "enqueued": 0,
+    "succeeded": 0,
+    "retried": 0,
+    "failed": 0,
+    "running": 0,
+}
+
+def job_name(job: dict):
+    return getattr(job["func"], "__name__", repr(job["func"]))
+
+async def run_job(job: dict):
+    result = job["func"](*job["args"], **job["kwargs"])
+    if asyncio.iscoroutine(result):
+        await result
+
+def retry_delay(attempts: int):
+    return TASK_RETRY_BASE_DELAY_SECONDS * 2 ** (attempts - 1)
+
+async def retry_later(job: dict, delay: float):
+    await asyncio.sleep(delay)
+    await task_queue.put(job)
+
+async def worker():
+    while True:
+        job = await task_queue.get()
+        job["attempts"] += 1
+        task_metrics["running"] += 1
+        try:
+            await run_job(job)
+            task_metrics["succeeded"] += 1
+        except Exception:
+            name = job_name(job)
+            if job["attempts"] < TASK_MAX_ATTEMPTS:
+                delay = retry_delay(job["attempts"])
+                logger.warning(
+                    "Task %s failed (attempt %d), retrying in %.1fs",
+                    name, job["attempts"], delay, exc_info=True,
+                )
+                task_metrics["retried"] += 1
+                retry = asyncio.create_task(retry_later(job, delay))
+                pending_retries.add(retry)
+                retry.add_done_callback(pending_retries.discard)
+            else:
+                logger.error(
+                    "Task %s failed after %d attempts", name, job["attempts"], exc_info=True,
+                )
+                task_metrics["failed"] += 1
+        finally:
+            task_metrics["running"] -= 1
+            task_queue.task_done()
+
+async def enqueue_task(func: Callable[..., Any], *args, **kwargs):
+    job = {"func": func, "args": args, "kwargs": kwargs, "attempts": 0}
+    task_metrics["enqueued"] += 1
+
+    # Without running workers (e.g. the app was not started through its
+    # lifespan) the job is executed right away so no work is lost. Its
+    # failures are logged rather than raised, as they would be on a worker,
+    # so they never fail the request that enqueued it.
+    if task_queue is None:
+        try:
+            await run_job(job)
+            task_metrics["succeeded"] += 1
+        except Exception:
+            logger.error("Task %s failed", job_name(job), exc_info=True)
+            task_metrics["failed"] += 1
+        return
+
+    await task_queue.put(job)
+
+async def start_workers():
+    global task_queue
+    task_queue = asyncio.Queue(maxsize=TASK_QUEUE_MAX_SIZE)
+    for _ in range(TASK_WORKER_COUNT):
+        workers.append(asyncio.create_task(worker()))
+
+async def drain_queue():
+    # A job waiting to be retried has already been marked done on the queue,
+    # so join() alone would return while it is still pending. Workers create
+    # the retry before marking the failed attempt done, so once join()
+    # returns every outstanding retry is in pending_retries.
+    while True:
+        await task_queue.join()
+        if not pending_retries:
+            return
+        await asyncio.wait(set(pending_retries))
+
+async def stop_workers():
+    global task_queue
+    if task_queue is None:
+        return
+
+    try:
+        await asyncio.wait_for(drain_queue(), timeout=TASK_SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning(
+            "Task queue not drained on shutdown, %d queued and %d retrying jobs dropped",
+            task_queue.qsize(), len(pending_retries),
+        )
+
+    for task in [*workers, *pending_retries]:
+        task.cancel()
+    await asyncio.gather(*workers, *pending_retries, return_exceptions=True)
+    workers.clear()
+    pending_retries.clear()
+    task_queue = None
+
+def get_task_metrics():
+    return {
+        **task_metrics,
+        "queue_depth": task_queue.qsize() if task_queue is not None else 0,
+        "pending_retries": len(pending_retries),
+        "workers": len(workers),
+    }
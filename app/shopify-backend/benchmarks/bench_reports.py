@@ -0,0 +1,68 @@
+# Times OrderLineStore reports over a synthetic order history.
+#
+#     python benchmarks/bench_reports.py [line_count]
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.analytics import OrderLineStore
+
+CATEGORIES = ["electronics", "clothing", "home", "books", "toys", "other"]
+STATUSES = ["pending", "paid", "shipped", "delivered", "cancelled"]
+DAY = 24 * 60 * 60
+
+def build_store(line_count: int, days: int = 365):
+    rng = np.random.default_rng(0)
+    now = int(time.time())
+    order_count = line_count // 3
+
+    store = OrderLineStore(CATEGORIES, STATUSES)
+    store.append_columns(
+        timestamps=np.sort(rng.integers(now - days * DAY, now, line_count)),
+        order_ids=np.sort(rng.integers(1, order_count + 1, line_count)),
+        product_ids=rng.integers(1, 5000, line_count),
+        category_ids=rng.integers(0, len(CATEGORIES), line_count).astype(np.int8),
+        quantities=rng.integers(1, 5, line_count).astype(np.int32),
+        cents=rng.integers(100, 200000, line_count),
+    )
+    store.order_status = rng.integers(0, len(STATUSES), order_count + 1).astype(np.int8)
+    return store, now
+
+def timed(label: str, func, repeat: int = 5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = func()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<48} {best * 1000:8.1f} ms  {len(rows):6d} rows")
+
+def main():
+    line_count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+
+    started = time.perf_counter()
+    store, now = build_store(line_count)
+    print(f"built {line_count:,} order lines in {time.perf_counter() - started:.1f}s")
+
+    start_90d = now - 90 * DAY
+    timed("90 days, per day", lambda: store.report(start_90d, now, DAY))
+    timed("90 days, per day x category", lambda: store.report(start_90d, now, DAY, by_category=True))
+    timed(
+        "90 days, per day x category x status",
+        lambda: store.report(start_90d, now, DAY, by_category=True, by_status=True),
+    )
+    timed(
+        "90 days, per day x category, paid+shipped only",
+        lambda: store.report(start_90d, now, DAY, by_category=True, statuses=["paid", "shipped"]),
+    )
+    timed(
+        "365 days, per week x category x status",
+        lambda: store.report(
+            now - 365 * DAY, now, 7 * DAY, by_category=True, by_status=True, bucket_offset=4 * DAY
+        ),
+    )
+
+if __name__ == "__main__":
+    main()
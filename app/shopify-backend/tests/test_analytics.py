@@ -0,0 +1,118 @@
+from datetime import datetime, timezone
+import numpy as np
+import pytest
+
+from app.analytics import OrderLineStore
+
+CATEGORIES = ["electronics", "books"]
+STATUSES = ["pending", "paid", "cancelled"]
+HOUR = 60 * 60
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+MONDAY_OFFSET = 4 * DAY
+
+def ts(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+@pytest.fixture
+def store():
+    store = OrderLineStore(CATEGORIES, STATUSES)
+    store.append_order(1, ts(2026, 10, 12, 9), "pending", [
+        (10, "electronics", 2, 2000),
+        (20, "books", 1, 500),
+    ])
+    store.append_order(2, ts(2026, 10, 13, 15), "paid", [(20, "books", 3, 1500)])
+    store.append_order(3, ts(2026, 10, 15, 23), "cancelled", [(10, "electronics", 1, 1000)])
+    return store
+
+def test_daily_totals(store):
+    rows = store.report(ts(2026, 10, 12), ts(2026, 10, 16), DAY)
+
+    assert [(row["bucket_start"], row["quantity"], row["revenue"], row["order_lines"]) for row in rows] == [
+        (ts(2026, 10, 12), 3, 25.0, 2),
+        (ts(2026, 10, 13), 3, 15.0, 1),
+        (ts(2026, 10, 15), 1, 10.0, 1),
+    ]
+    assert all(row["category"] is None and row["status"] is None for row in rows)
+
+def test_range_end_is_exclusive(store):
+    rows = store.report(ts(2026, 10, 12), ts(2026, 10, 13, 15), DAY)
+    assert [row["order_lines"] for row in rows] == [2]
+
+def test_group_by_category(store):
+    rows = store.report(ts(2026, 10, 12), ts(2026, 10, 13), DAY, by_category=True)
+
+    assert [(row["category"], row["quantity"], row["revenue"]) for row in rows] == [
+        ("electronics", 2, 20.0),
+        ("books", 1, 5.0),
+    ]
+
+def test_weeks_start_on_monday_with_offset(store):
+    # 2026-10-12 is a Monday and 2026-10-15 a Thursday.
+    rows = store.report(ts(2026, 10, 1), ts(2026, 10, 20), WEEK, bucket_offset=MONDAY_OFFSET)
+    assert [row["bucket_start"] for row in rows] == [ts(2026, 10, 12)]
+    assert rows[0]["order_lines"] == 4
+
+    epoch_aligned = store.report(ts(2026, 10, 1), ts(2026, 10, 20), WEEK)
+    assert [row["bucket_start"] for row in epoch_aligned] == [ts(2026, 10, 8), ts(2026, 10, 15)]
+
+def test_status_filter_without_grouping(store):
+    rows = store.report(ts(2026, 10, 12), ts(2026, 10, 16), WEEK, statuses=["paid", "pending"])
+
+    assert len(rows) == 1
+    assert rows[0]["status"] is None
+    assert rows[0]["order_lines"] == 3
+    assert rows[0]["revenue"] == 40.0
+
+def test_group_by_status_with_filter(store):
+    rows = store.report(
+        ts(2026, 10, 12), ts(2026, 10, 16), WEEK,
+        by_status=True, statuses=["paid", "cancelled"], bucket_offset=MONDAY_OFFSET,
+    )
+
+    assert [(row["status"], row["order_lines"]) for row in rows] == [("paid", 1), ("cancelled", 1)]
+
+def test_status_update_after_append_is_reported(store):
+    store.set_order_status(1, "paid")
+
+    rows = store.report(ts(2026, 10, 12), ts(2026, 10, 16), WEEK, by_status=True, bucket_offset=MONDAY_OFFSET)
+
+    assert [(row["status"], row["order_lines"]) for row in rows] == [("paid", 3), ("cancelled", 1)]
+
+def test_lines_without_status_are_skipped_only_when_grouping_by_status(store):
+    store.append_columns(
+        timestamps=np.array([ts(2026, 10, 15, 23, 30)]),
+        order_ids=np.array([4]),
+        product_ids=np.array([10]),
+        category_ids=np.array([0], dtype=np.int8),
+        quantities=np.array([5], dtype=np.int32),
+        cents=np.array([700]),
+    )
+    start, end = ts(2026, 10, 12), ts(2026, 10, 16)
+
+    totals = store.report(start, end, WEEK, bucket_offset=MONDAY_OFFSET)
+    assert totals[0]["order_lines"] == 5
+
+    by_status = store.report(start, end, WEEK, by_status=True, bucket_offset=MONDAY_OFFSET)
+    assert sum(row["order_lines"] for row in by_status) == 4
+
+    store.set_order_status(4, "paid")
+    by_status = store.report(start, end, WEEK, by_status=True, bucket_offset=MONDAY_OFFSET)
+    assert sum(row["order_lines"] for row in by_status) == 5
+
+def test_columns_grow_past_initial_capacity():
+    store = OrderLineStore(CATEGORIES, STATUSES)
+    start = ts(2026, 1, 1)
+    for order_id in range(1, 1501):
+        store.append_order(order_id, start + order_id * HOUR, "paid", [(1, "books", 1, 100)])
+
+    rows = store.report(start, start + 2000 * HOUR, 1000 * DAY)
+    assert sum(row["order_lines"] for row in rows) == 1500
+    assert sum(row["revenue"] for row in rows) == 1500.0
+
+def test_snapshot_is_not_affected_by_later_appends(store):
+    snapshot = store.snapshot()
+    store.append_order(4, ts(2026, 10, 15, 23, 59), "paid", [(10, "electronics", 1, 100)])
+
+    assert sum(row["order_lines"] for row in snapshot.report(ts(2026, 10, 12), ts(2026, 10, 16), WEEK)) == 4
+    assert sum(row["order_lines"] for row in store.report(ts(2026, 10, 12), ts(2026, 10, 16), WEEK)) == 5
@@ -0,0 +1,172 @@
+import asyncio
+import pytest
+
+from app.routers import cart
+from app.routers.cart import (
+    CartItemCreate,
+    add_to_cart,
+    clear_cart,
+    get_cart_items,
+    get_cart_metrics,
+    get_user_cart_item_ids,
+    remove_cart_items,
+    remove_from_cart,
+)
+
+ALICE = {"id": 101}
+BOB = {"id": 102}
+CAROL = {"id": 103}
+
+@pytest.fixture(autouse=True)
+def reset_carts():
+    cart.cart_items_db.clear()
+    cart.user_cart_item_ids.clear()
+    cart.cart_last_touched.clear()
+    for name in cart.cart_metrics:
+        cart.cart_metrics[name] = 0
+    yield
+    cart.cart_items_db.clear()
+    cart.user_cart_item_ids.clear()
+    cart.cart_last_touched.clear()
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cart.time, "monotonic", lambda: now[0])
+    return now
+
+def add(user, product_id, quantity=1):
+    return asyncio.run(add_to_cart(CartItemCreate(product_id=product_id, quantity=quantity), user))
+
+def items(user):
+    return asyncio.run(get_cart_items(user))
+
+def assert_index_consistent():
+    indexed = [item_id for item_ids in cart.user_cart_item_ids.values() for item_id in item_ids]
+    assert sorted(indexed) == sorted(cart.cart_items_db)
+    for user_id, item_ids in cart.user_cart_item_ids.items():
+        assert item_ids
+        assert all(cart.cart_items_db[item_id]["user_id"] == user_id for item_id in item_ids)
+    assert set(cart.cart_last_touched) == set(cart.user_cart_item_ids)
+
+def test_adding_same_product_increases_quantity():
+    first = add(ALICE, 1)
+    second = add(ALICE, 1, 2)
+
+    assert second["id"] == first["id"]
+    assert [item["quantity"] for item in items(ALICE)] == [3]
+    assert_index_consistent()
+
+def test_idle_cart_expires(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_TTL_SECONDS", 60)
+    add(ALICE, 1)
+    add(ALICE, 2)
+    clock[0] += 30
+    add(BOB, 1)
+
+    clock[0] += 31
+    assert items(BOB) != []
+    assert items(ALICE) == []
+
+    metrics = get_cart_metrics()
+    assert metrics["expired_carts"] == 1
+    assert metrics["live_carts"] == 1
+    assert metrics["cart_items"] == 1
+    assert_index_consistent()
+
+def test_touching_cart_postpones_expiry(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_TTL_SECONDS", 60)
+    add(ALICE, 1)
+    clock[0] += 50
+    items(ALICE)
+    clock[0] += 50
+
+    assert len(items(ALICE)) == 1
+    assert get_cart_metrics()["expired_carts"] == 0
+
+def test_viewing_empty_cart_is_not_tracked(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_TTL_SECONDS", 60)
+    assert items(ALICE) == []
+    clock[0] += 61
+    items(BOB)
+
+    assert len(cart.cart_last_touched) == 0
+    assert get_cart_metrics()["expired_carts"] == 0
+
+def test_cap_evicts_least_recently_touched_cart(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_MAX_ITEMS", 3)
+    add(ALICE, 1)
+    clock[0] += 1
+    add(BOB, 1)
+    clock[0] += 1
+    items(ALICE)
+    clock[0] += 1
+    add(CAROL, 1)
+    clock[0] += 1
+    add(CAROL, 2)
+
+    assert len(items(ALICE)) == 1
+    assert items(BOB) == []
+    assert len(items(CAROL)) == 2
+    assert get_cart_metrics()["evicted_carts"] == 1
+    assert_index_consistent()
+
+def test_cap_never_evicts_newest_cart(monkeypatch):
+    monkeypatch.setattr(cart, "CART_MAX_ITEMS", 1)
+    add(ALICE, 1)
+    add(BOB, 1)
+    add(BOB, 2)
+
+    assert items(ALICE) == []
+    assert len(items(BOB)) == 2
+    assert get_cart_metrics()["evicted_carts"] == 1
+    assert_index_consistent()
+
+def test_removing_last_item_drops_cart(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_TTL_SECONDS", 60)
+    item = add(ALICE, 1)
+    asyncio.run(remove_from_cart(item["id"], ALICE))
+
+    assert ALICE["id"] not in cart.user_cart_item_ids
+    assert ALICE["id"] not in cart.cart_last_touched
+    assert_index_consistent()
+
+    clock[0] += 61
+    items(BOB)
+    metrics = get_cart_metrics()
+    assert metrics["expired_carts"] == 0
+    assert metrics["live_carts"] == 0
+
+def test_clear_cart_removes_only_own_items():
+    add(ALICE, 1)
+    add(BOB, 1)
+    asyncio.run(clear_cart(ALICE))
+
+    assert items(ALICE) == []
+    assert len(items(BOB)) == 1
+    assert_index_consistent()
+
+def test_deferred_removal_skips_items_already_gone():
+    first = add(ALICE, 1)
+    second = add(ALICE, 2)
+    checkout_item_ids = get_user_cart_item_ids(ALICE["id"])
+
+    asyncio.run(remove_from_cart(first["id"], ALICE))
+    added_after_checkout = add(ALICE, 3)
+    remove_cart_items(checkout_item_ids)
+
+    assert [item["id"] for item in items(ALICE)] == [added_after_checkout["id"]]
+    assert second["id"] not in cart.cart_items_db
+    assert_index_consistent()
+
+def test_deferred_removal_after_cart_expired(monkeypatch, clock):
+    monkeypatch.setattr(cart, "CART_TTL_SECONDS", 60)
+    add(ALICE, 1)
+    checkout_item_ids = get_user_cart_item_ids(ALICE["id"])
+    clock[0] += 61
+    items(BOB)
+
+    remove_cart_items(checkout_item_ids)
+
+    assert items(ALICE) == []
+    assert_index_consistent()
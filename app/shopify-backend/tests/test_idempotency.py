@@ -0,0 +1,161 @@
+from fastapi import HTTPException
+import asyncio
+import pytest
+
+from app import idempotency
+from app.idempotency import run_idempotent
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    idempotency.idempotency_cache.clear()
+    yield
+    idempotency.idempotency_cache.clear()
+
+def test_without_key_always_runs_handler():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        first = await run_idempotent("scope", 1, None, "body", handler)
+        second = await run_idempotent("scope", 1, None, "body", handler)
+        return first, second
+
+    assert asyncio.run(scenario()) == (1, 2)
+    assert len(idempotency.idempotency_cache) == 0
+
+def test_concurrent_duplicates_run_handler_once():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"id": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*[
+            run_idempotent("scope", 1, "key", "body", handler) for _ in range(5)
+        ])
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [{"id": 1}] * 5
+
+def test_sequential_duplicate_returns_cached_response():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return {"id": len(calls)}
+
+    async def scenario():
+        first = await run_idempotent("scope", 1, "key", "body", handler)
+        second = await run_idempotent("scope", 1, "key", "body", handler)
+        return first, second
+
+    assert asyncio.run(scenario()) == ({"id": 1}, {"id": 1})
+    assert len(calls) == 1
+
+def test_keys_are_scoped_per_user_and_endpoint():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        return [
+            await run_idempotent("scope", 1, "key", "body", handler),
+            await run_idempotent("scope", 2, "key", "body", handler),
+            await run_idempotent("other", 1, "key", "body", handler),
+        ]
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+def test_different_body_with_same_key_is_rejected():
+    async def handler():
+        return {"id": 1}
+
+    async def scenario():
+        await run_idempotent("scope", 1, "key", "body", handler)
+        await run_idempotent("scope", 1, "key", "other body", handler)
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(scenario())
+    assert exc_info.value.status_code == 422
+
+def test_failure_is_shared_with_waiters_but_not_cached():
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        if len(calls) == 1:
+            raise HTTPException(status_code=400, detail="boom")
+        return {"id": len(calls)}
+
+    async def scenario():
+        results = await asyncio.gather(
+            run_idempotent("scope", 1, "key", "body", handler),
+            run_idempotent("scope", 1, "key", "body", handler),
+            return_exceptions=True,
+        )
+        retry = await run_idempotent("scope", 1, "key", "body", handler)
+        return results, retry
+
+    results, retry = asyncio.run(scenario())
+    assert all(isinstance(result, HTTPException) for result in results)
+    assert retry == {"id": 2}
+    assert len(calls) == 2
+
+def test_in_flight_entries_survive_overflow(monkeypatch):
+    monkeypatch.setattr(idempotency, "IDEMPOTENCY_CACHE_MAX_ENTRIES", 1)
+    calls = []
+
+    async def slow_handler():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"id": 1}
+
+    async def fast_handler():
+        return {"id": 2}
+
+    async def scenario():
+        first = asyncio.create_task(run_idempotent("scope", 1, "slow", "body", slow_handler))
+        await asyncio.sleep(0)
+        await run_idempotent("scope", 1, "fast", "body", fast_handler)
+        duplicate = await run_idempotent("scope", 1, "slow", "body", slow_handler)
+        return await first, duplicate
+
+    assert asyncio.run(scenario()) == ({"id": 1}, {"id": 1})
+    assert len(calls) == 1
+
+def test_cancelled_request_is_not_cached():
+    calls = []
+    started = asyncio.Event()
+
+    async def handler():
+        calls.append(1)
+        started.set()
+        await asyncio.sleep(0.02)
+        return {"id": len(calls)}
+
+    async def scenario():
+        first = asyncio.create_task(run_idempotent("scope", 1, "key", "body", handler))
+        await started.wait()
+        waiter = asyncio.create_task(run_idempotent("scope", 1, "key", "body", handler))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        waited = await waiter
+        retry = await run_idempotent("scope", 1, "key", "body", handler)
+        return waited, retry
+
+    waited, retry = asyncio.run(scenario())
+    assert waited == {"id": 2}
+    assert retry == {"id": 2}
+    assert len(calls) == 2
@@ -0,0 +1,68 @@
+import pytest
+
+from app.routers import users
+from app.routers.users import create_tokens, get_session, users_db
+
+@pytest.fixture(autouse=True)
+def clear_sessions():
+    users.sessions_db.clear()
+    yield
+    users.sessions_db.clear()
+
+@pytest.fixture
+def user():
+    return users_db[1]
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(users.time, "monotonic", lambda: now[0])
+    return now
+
+def test_refresh_rotates_token_within_same_session(user):
+    first = create_tokens(user)["refresh_token"]
+    session_id, session = get_session(first)
+    assert session["user_id"] == user["id"]
+
+    second = create_tokens(user, session_id)["refresh_token"]
+    assert second != first
+    assert second.split(".")[0] == session_id
+    assert get_session(second)[0] == session_id
+    assert len(users.sessions_db) == 1
+
+def test_reusing_rotated_token_revokes_session(user):
+    first = create_tokens(user)["refresh_token"]
+    session_id, _ = get_session(first)
+    second = create_tokens(user, session_id)["refresh_token"]
+
+    assert get_session(first) == (None, None)
+    assert get_session(second) == (None, None)
+    assert session_id not in users.sessions_db
+
+def test_unknown_or_malformed_token_is_rejected(user):
+    create_tokens(user)
+    assert get_session("garbage") == (None, None)
+    assert get_session("nosuchsession.secret") == (None, None)
+
+def test_idle_session_expires(user, clock):
+    token = create_tokens(user)["refresh_token"]
+    clock[0] += users.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60 + 1
+
+    assert get_session(token) == (None, None)
+    assert len(users.sessions_db) == 0
+
+def test_refresh_cannot_extend_session_past_max_lifetime(user, clock):
+    token = create_tokens(user)["refresh_token"]
+    refresh_interval = (users.REFRESH_TOKEN_EXPIRE_DAYS - 1) * 24 * 60 * 60
+    max_lifetime = users.SESSION_MAX_LIFETIME_DAYS * 24 * 60 * 60
+
+    elapsed = 0
+    while elapsed + refresh_interval <= max_lifetime:
+        clock[0] += refresh_interval
+        elapsed += refresh_interval
+        session_id, session = get_session(token)
+        assert session is not None
+        token = create_tokens(user, session_id)["refresh_token"]
+
+    clock[0] += refresh_interval
+    assert get_session(token) == (None, None)
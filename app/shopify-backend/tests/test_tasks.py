@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+
+from app import tasks
+from app.tasks import enqueue_task, get_task_metrics
+
+@pytest.fixture(autouse=True)
+def reset_tasks():
+    for name in tasks.task_metrics:
+        tasks.task_metrics[name] = 0
+    yield
+    tasks.task_queue = None
+    tasks.workers.clear()
+    tasks.pending_retries.clear()
+
+def test_inline_job_runs_without_workers():
+    calls = []
+
+    asyncio.run(enqueue_task(calls.append, 1))
+
+    assert calls == [1]
+    assert get_task_metrics()["succeeded"] == 1
+
+def test_inline_job_failure_is_logged_not_raised(caplog):
+    def fail():
+        raise RuntimeError("boom")
+
+    asyncio.run(enqueue_task(fail))
+
+    metrics = get_task_metrics()
+    assert metrics["failed"] == 1
+    assert metrics["succeeded"] == 0
+    assert "Task fail failed" in caplog.text
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(tasks, "TASK_RETRY_BASE_DELAY_SECONDS", 0.001)
+    monkeypatch.setattr(tasks, "TASK_MAX_ATTEMPTS", 3)
+
+def test_retry_delay_backs_off_exponentially(monkeypatch):
+    monkeypatch.setattr(tasks, "TASK_RETRY_BASE_DELAY_SECONDS", 0.5)
+    assert [tasks.retry_delay(attempt) for attempt in (1, 2, 3, 4)] == [0.5, 1.0, 2.0, 4.0]
+
+def test_worker_runs_sync_and_async_jobs():
+    calls = []
+
+    async def record_async(value):
+        calls.append(value)
+
+    async def scenario():
+        await tasks.start_workers()
+        await enqueue_task(calls.append, "sync")
+        await enqueue_task(record_async, "async")
+        await tasks.stop_workers()
+
+    asyncio.run(scenario())
+
+    assert sorted(calls) == ["async", "sync"]
+    metrics = get_task_metrics()
+    assert metrics["enqueued"] == 2
+    assert metrics["succeeded"] == 2
+    assert metrics["queue_depth"] == 0
+    assert metrics["workers"] == 0
+
+def test_failed_job_is_retried_until_it_succeeds(fast_retries):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("boom")
+
+    async def scenario():
+        await tasks.start_workers()
+        await enqueue_task(flaky)
+        await tasks.stop_workers()
+
+    asyncio.run(scenario())
+
+    assert len(attempts) == 3
+    metrics = get_task_metrics()
+    assert metrics["retried"] == 2
+    assert metrics["succeeded"] == 1
+    assert metrics["failed"] == 0
+
+def test_job_fails_after_max_attempts(fast_retries):
+    attempts = []
+
+    def always_fails():
+        attempts.append(1)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        await tasks.start_workers()
+        await enqueue_task(always_fails)
+        await tasks.stop_workers()
+
+    asyncio.run(scenario())
+
+    assert len(attempts) == 3
+    metrics = get_task_metrics()
+    assert metrics["retried"] == 2
+    assert metrics["failed"] == 1
+    assert metrics["succeeded"] == 0
+
+def test_shutdown_waits_for_pending_retries(monkeypatch):
+    monkeypatch.setattr(tasks, "TASK_RETRY_BASE_DELAY_SECONDS", 0.05)
+    attempts = []
+
+    def fails_once():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("boom")
+
+    async def scenario():
+        await tasks.start_workers()
+        await enqueue_task(fails_once)
+        await asyncio.sleep(0.01)
+        assert get_task_metrics()["pending_retries"] == 1
+        await tasks.stop_workers()
+
+    asyncio.run(scenario())
+
+    assert len(attempts) == 2
+    assert get_task_metrics()["succeeded"] == 1
+
+def test_shutdown_timeout_reports_dropped_retries(monkeypatch, caplog):
+    monkeypatch.setattr(tasks, "TASK_RETRY_BASE_DELAY_SECONDS", 10)
+    monkeypatch.setattr(tasks, "TASK_SHUTDOWN_TIMEOUT_SECONDS", 0.05)
+
+    def fail():
+        raise RuntimeError("boom")
+
+    async def scenario():
+        await tasks.start_workers()
+        await enqueue_task(fail)
+        await tasks.stop_workers()
+
+    asyncio.run(scenario())
+
+    assert "0 queued and 1 retrying jobs dropped" in caplog.text
+    assert get_task_metrics()["pending_retries"] == 0
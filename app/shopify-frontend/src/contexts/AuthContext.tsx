@@ -1,6 +1,6 @@
 import { createContext, useContext, useEffect, useState, ReactNode } from 'react';
 import { User } from '../types';
-import { authApi } from '../lib/api';
+import { authApi, clearTokens, storeTokens } from '../lib/api';
 
 interface AuthContextType {
   user: User | null;
@@ -33,7 +33,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
       setUser(userData);
     } catch (error) {
       console.error('Failed to fetch user:', error);
-      localStorage.removeItem('token');
+      clearTokens();
     } finally {
       setIsLoading(false);
     }
@@ -42,8 +42,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   async function login(email: string, password: string) {
     setIsLoading(true);
     try {
-      const { access_token } = await authApi.login(email, password);
-      localStorage.setItem('token', access_token);
+      storeTokens(await authApi.login(email, password));
       await fetchUser();
     } catch (error) {
       console.error('Login failed:', error);
@@ -67,7 +66,7 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }
 
   function logout() {
-    localStorage.removeItem('token');
+    authApi.logout();
     setUser(null);
   }
 
@@ -2,9 +2,56 @@ import { AuthResponse, CartItem, Order, PaymentIntent, Product, User } from "../
 
 const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
+export function storeTokens({ access_token, refresh_token }: AuthResponse) {
+  localStorage.setItem('token', access_token);
+  if (refresh_token) {
+    localStorage.setItem('refresh_token', refresh_token);
+  }
+}
+
+export function clearTokens() {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refresh_token');
+}
+
+let refreshInFlight: Promise<boolean> | null = null;
+
+// Exchanges the stored refresh token for a new token pair. Concurrent
+// callers share a single request, since every refresh rotates the token and
+// the server revokes the session if an old one is presented again.
+function refreshAccessToken(): Promise<boolean> {
+  const refreshToken = localStorage.getItem('refresh_token');
+  if (!refreshToken) {
+    return Promise.resolve(false);
+  }
+
+  if (!refreshInFlight) {
+    refreshInFlight = fetch(`${API_URL}/users/token/refresh`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ refresh_token: refreshToken }),
+    })
+      .then(async response => {
+        if (!response.ok) {
+          clearTokens();
+          return false;
+        }
+        storeTokens(await response.json());
+        return true;
+      })
+      .catch(() => false)
+      .finally(() => {
+        refreshInFlight = null;
+      });
+  }
+
+  return refreshInFlight;
+}
+
 async function fetchApi<T>(
   endpoint: string,
-  options: RequestInit = {}
+  options: RequestInit = {},
+  retryOnUnauthorized = true
 ): Promise<T> {
   const token = localStorage.getItem('token');
   
@@ -19,6 +66,12 @@ async function fetchApi<T>(
     headers,
   });
   
+  // An expired access token is renewed with the refresh token and the
+  // request retried once, instead of sending the user back to the login page.
+  if (response.status === 401 && retryOnUnauthorized && await refreshAccessToken()) {
+    return fetchApi<T>(endpoint, options, false);
+  }
+  
   if (!response.ok) {
     const error = await response.json().catch(() => ({}));
     throw new Error(error.detail || `API error: ${response.status}`);
@@ -51,6 +104,18 @@ export const authApi = {
       return response.json() as Promise<AuthResponse>;
     }),
     
+  logout: () => {
+    const refreshToken = localStorage.getItem('refresh_token');
+    clearTokens();
+    if (refreshToken) {
+      fetch(`${API_URL}/users/token/revoke`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ refresh_token: refreshToken }),
+      }).catch(() => undefined);
+    }
+  },
+    
   getCurrentUser: () => fetchApi<User>('/users/me'),
 };
 
@@ -6,6 +6,7 @@ import { useCart } from '../contexts/CartContext';
 import { useAuth } from '../contexts/AuthContext';
 import { useToast } from '../components/ui/use-toast';
 import { Input } from '../components/ui/input';
+import { productImageUrl } from '../lib/utils';
 
 export default function CartPage() {
   const { items, updateItemQuantity, removeItem, totalPrice, isLoading } = useCart();
@@ -101,7 +102,7 @@ export default function CartPage() {
                       <td className="py-4">
                         <div className="flex items-center">
                           <img
-                            src={item.product.image_url}
+                            src={productImageUrl(item.product, 'thumbnail')}
                             alt={item.product.name}
                             className="w-16 h-16 object-cover rounded mr-4"
                           />
@@ -5,6 +5,7 @@ import { Product, ProductCategory } from '../types';
 import { Button } from '../components/ui/button';
 import { useCart } from '../contexts/CartContext';
 import { useToast } from '../components/ui/use-toast';
+import { productImageUrl } from '../lib/utils';
 
 export default function HomePage() {
   const [products, setProducts] = useState<Product[]>([]);
@@ -98,7 +99,7 @@ export default function HomePage() {
             <div key={product.id} className="bg-white rounded-lg shadow-md overflow-hidden">
               <Link to={`/products/${product.id}`}>
                 <img
-                  src={product.image_url}
+                  src={productImageUrl(product, 'card')}
                   alt={product.name}
                   className="w-full h-48 object-cover"
                 />
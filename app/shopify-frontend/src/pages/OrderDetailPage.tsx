@@ -4,7 +4,7 @@ import { ordersApi } from '../lib/api';
 import { Order, OrderStatus } from '../types';
 import { Button } from '../components/ui/button';
 import { useToast } from '../components/ui/use-toast';
-import { formatDate, formatCurrency } from '../lib/utils';
+import { formatDate, formatCurrency, productImageUrl } from '../lib/utils';
 
 export default function OrderDetailPage() {
   const { id } = useParams<{ id: string }>();
@@ -136,7 +136,7 @@ export default function OrderDetailPage() {
                   <td className="px-6 py-4">
                     <div className="flex items-center">
                       <img
-                        src={item.product.image_url}
+                        src={productImageUrl(item.product, 'thumbnail')}
                         alt={item.product.name}
                         className="w-12 h-12 object-cover rounded mr-4"
                       />
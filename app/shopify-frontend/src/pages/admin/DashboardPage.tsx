@@ -3,6 +3,7 @@ import { Link } from 'react-router-dom';
 import { ordersApi, productsApi } from '../../lib/api';
 import { Order, Product } from '../../types';
 import { useToast } from '../../components/ui/use-toast';
+import { productImageUrl } from '../../lib/utils';
 
 export default function AdminDashboardPage() {
   const [orders, setOrders] = useState<Order[]>([]);
@@ -166,7 +167,7 @@ export default function AdminDashboardPage() {
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div className="flex items-center">
                           <img
-                            src={product.image_url}
+                            src={productImageUrl(product, 'thumbnail')}
                             alt={product.name}
                             className="w-10 h-10 object-cover rounded mr-3"
                           />
@@ -6,6 +6,7 @@ import { Input } from '../../components/ui/input';
 import { Textarea } from '../../components/ui/textarea';
 import { useToast } from '../../components/ui/use-toast';
 import { Pencil, Trash2, Plus } from 'lucide-react';
+import { productImageUrl } from '../../lib/utils';
 
 export default function AdminProductsPage() {
   const [products, setProducts] = useState<Product[]>([]);
@@ -286,7 +287,7 @@ export default function AdminProductsPage() {
                     <td className="px-6 py-4 whitespace-nowrap">
                       <div className="flex items-center">
                         <img
-                          src={product.image_url}
+                          src={productImageUrl(product, 'thumbnail')}
                           alt={product.name}
                           className="w-10 h-10 object-cover rounded mr-3"
                         />
@@ -20,12 +20,19 @@ export enum ProductCategory {
   OTHER = "other"
 }
 
+export interface ProductImageVariants {
+  thumbnail: string;
+  card: string;
+  detail: string;
+}
+
 export interface Product {
   id: number;
   name: string;
   description: string;
   price: number;
   image_url: string;
+  image_variants?: ProductImageVariants | null;
   category: ProductCategory;
   inventory_count: number;
   created_at: string;
@@ -69,6 +76,7 @@ export interface Order {
 export interface AuthResponse {
   access_token: string;
   token_type: string;
+  refresh_token?: string | null;
 }
 
 export interface PaymentIntent {